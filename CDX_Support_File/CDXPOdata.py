@@ -1,13 +1,13 @@
 # ========================================
 # File: CDXPOdata.py
 # ========================================
-import hmac
-import hashlib
-import json
-import time
-import requests
 import os
+import time
+from typing import Optional
+
 from dotenv import load_dotenv
+from CDXresilience import endpoint
+from CDXsigner import CLOCK, BodyTemplate, Field, RequestSigner, timed_get, timed_post
 
 load_dotenv()
 
@@ -16,34 +16,32 @@ API_SECRET = os.getenv("CD_API_SECRET")
 
 print("💡 CDXPOdata.py loaded from:", __file__)  # Confirms correct file is used
 
-def get_xrp_data():
+# Both calls are reads, so they are hedged; 4s budget each, and together
+# never more than the `budget` passed to get_xrp_data
+POSITIONS_ENDPOINT = endpoint("positions", budget=4.0, hedge=True)
+TICKER_ENDPOINT = endpoint("ticker", budget=4.0, hedge=True)
+
+SIGNER = RequestSigner(API_KEY, API_SECRET)
+
+POSITIONS_URL = "https://api.coindcx.com/exchange/v1/derivatives/futures/positions"
+POSITIONS_BODY = BodyTemplate({
+    "timestamp": Field("timestamp"),
+    "page": "1",
+    "size": "10",
+    "pairs": "B-XRP_USDT",
+    "margin_currency_short_name": ["INR"]
+})
+
+def get_xrp_data(budget: Optional[float] = None):
     """
     Fetch positions and current XRP-USDT price.
+    `budget` caps total seconds for both reads; the price read only gets
+    what the positions read left over.
     Returns a dictionary for safe key-based access.
     """
-    key = API_KEY
-    secret = API_SECRET
-    secret_bytes = bytes(secret, encoding="utf-8")
-
-    timestamp = int(round(time.time() * 1000))
-
-    body = {
-        "timestamp": timestamp,
-        "page": "1",
-        "size": "10",
-        "pairs": "B-XRP_USDT",
-        "margin_currency_short_name": ["INR"]
-    }
-
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-
-    url = "https://api.coindcx.com/exchange/v1/derivatives/futures/positions"
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": key,
-        "X-AUTH-SIGNATURE": signature
-    }
+    deadline = None if budget is None else time.monotonic() + budget
+    json_body = POSITIONS_BODY.render(timestamp=CLOCK.now_ms())
+    headers = SIGNER.headers(json_body)
 
     # Default values
     data_dict = {
@@ -59,7 +57,11 @@ def get_xrp_data():
 
     # Fetch positions
     try:
-        response = requests.post(url, data=json_body, headers=headers, timeout=10)
+        response = POSITIONS_ENDPOINT.call(
+            lambda timeout: timed_post(POSITIONS_URL, json_body, headers, timeout),
+            budget,
+        )
+        response.raise_for_status()
         positions = response.json()
         if positions:
             item = positions[0]
@@ -71,12 +73,17 @@ def get_xrp_data():
             data_dict["stop_loss"] = float(item.get("stop_loss_trigger", 0.0))
             data_dict["locked_order_margin"] = float(item.get("locked_order_margin", 0.0))
     except Exception as e:
+        # Never report a fake flat position: callers retry on failure
         print("⚠️ Error fetching positions:", e)
+        raise
 
     # Fetch current price
     try:
         url_price = "https://api.coindcx.com/exchange/ticker"
-        resp = requests.get(url_price, timeout=10).json()
+        resp = TICKER_ENDPOINT.call(
+            lambda timeout: timed_get(url_price, timeout),
+            None if deadline is None else deadline - time.monotonic(),
+        ).json()
         for t in resp:
             if t["market"] in ["XRPUSDT", "B-XRP_USDT", "XRP-USDT"]:
                 data_dict["XRPCurentPrice"] = float(t.get("last_price") or t.get("lastPrice") or 0.0)
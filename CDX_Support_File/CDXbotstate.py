@@ -0,0 +1,178 @@
+# ========================================
+# File: CDXbotstate.py
+# Purpose: Per-bot trade state machine with immutable snapshots.
+# Flow:    idle -> signal -> entering -> protecting -> in_position -> closed -> idle
+# Notes:   - only the owning bot thread writes; every write publishes a new
+#            frozen BotSnapshot, so readers (Flask, metrics) just grab the
+#            current reference without taking any lock
+#          - any phase may fall back to idle (error / failed step)
+# ========================================
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# -------------------------
+# Phases & allowed transitions
+# -------------------------
+IDLE = "idle"
+SIGNAL = "signal"
+ENTERING = "entering"
+PROTECTING = "protecting"
+IN_POSITION = "in_position"
+CLOSED = "closed"
+
+TRANSITIONS = {
+    IDLE: {SIGNAL, PROTECTING, IN_POSITION},   # open position found at cycle start: unprotected / protected
+    SIGNAL: {ENTERING},
+    ENTERING: {PROTECTING},
+    PROTECTING: {IN_POSITION},
+    IN_POSITION: {CLOSED},
+    CLOSED: {IDLE},
+}
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+# -------------------------
+# Immutable slot records
+# -------------------------
+class _Record:
+    """Frozen __slots__ record; use replace() to derive a modified copy."""
+    __slots__ = ()
+    _defaults: Dict[str, Any] = {}
+
+    def __init__(self, **fields: Any):
+        unknown = set(fields) - set(self.__slots__)
+        if unknown:
+            raise TypeError(f"{type(self).__name__}: unknown fields {sorted(unknown)}")
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.get(name, self._defaults.get(name)))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def replace(self, **changes: Any) -> "_Record":
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return type(self)(**fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            out[name] = value.to_dict() if isinstance(value, _Record) else value
+        return out
+
+    def __repr__(self) -> str:
+        body = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({body})"
+
+
+class PositionState(_Record):
+    """Last position data reported by the exchange."""
+    __slots__ = ("active_pos", "entry_price", "take_profit", "stop_loss",
+                 "price", "last_active_price", "updated_at")
+    _defaults = {name: 0.0 for name in __slots__}
+
+    @property
+    def is_open(self) -> bool:
+        return abs(self.active_pos) > 0.00001
+
+
+class BotSnapshot(_Record):
+    """Point-in-time view of one bot, safe to hand to any thread."""
+    __slots__ = ("bot", "symbol", "phase", "phase_since", "position",
+                 "signal", "signal_price", "signal_atr", "quantity",
+                 "tp_price", "sl_price", "cycle_step", "cumulative_pnl_est",
+                 "last_error", "version")
+    _defaults = {"phase": IDLE, "cycle_step": 1, "cumulative_pnl_est": 0.0, "version": 0}
+
+
+# -------------------------
+# State machine
+# -------------------------
+class TradeStateMachine:
+    """
+    Owns one bot's state. Writes are serialised by a lock (cheap, single
+    writer in practice); reads via snapshot() are lock-free.
+    """
+
+    def __init__(self, bot: str, symbol: str):
+        self._lock = threading.Lock()
+        self._snapshot = BotSnapshot(bot=bot, symbol=symbol, phase_since=time.time(),
+                                     position=PositionState())
+
+    # --- readers ---
+    def snapshot(self) -> BotSnapshot:
+        return self._snapshot
+
+    @property
+    def phase(self) -> str:
+        return self._snapshot.phase
+
+    @property
+    def position(self) -> PositionState:
+        return self._snapshot.position
+
+    # --- writers ---
+    def _publish(self, **changes: Any) -> BotSnapshot:
+        current = self._snapshot
+        changes["version"] = current.version + 1
+        self._snapshot = current.replace(**changes)
+        return self._snapshot
+
+    def transition(self, phase: str, **changes: Any) -> BotSnapshot:
+        """Move to `phase` (must be allowed, or idle) and apply field changes."""
+        with self._lock:
+            current = self._snapshot.phase
+            if phase != IDLE and phase not in TRANSITIONS[current]:
+                raise InvalidTransition(f"{self._snapshot.bot}: {current} -> {phase} not allowed")
+            if phase == IDLE:
+                changes.setdefault("signal", None)
+                changes.setdefault("signal_price", None)
+                changes.setdefault("signal_atr", None)
+                changes.setdefault("tp_price", None)
+                changes.setdefault("sl_price", None)
+            return self._publish(phase=phase, phase_since=time.time(), **changes)
+
+    def update(self, **changes: Any) -> BotSnapshot:
+        """Apply field changes without changing phase."""
+        with self._lock:
+            return self._publish(**changes)
+
+    def update_position(self, **fields: Any) -> BotSnapshot:
+        """Replace position data from the latest exchange read."""
+        with self._lock:
+            position = self._snapshot.position.replace(updated_at=time.time(), **fields)
+            return self._publish(position=position)
+
+
+# -------------------------
+# Process-wide registry (many bots per process)
+# -------------------------
+_registry: Dict[str, TradeStateMachine] = {}
+
+
+def register(machine: TradeStateMachine) -> TradeStateMachine:
+    global _registry
+    name = machine.snapshot().bot
+    if name in _registry and _registry[name] is not machine:
+        raise ValueError(f"Bot '{name}' already registered")
+    # copy-on-write so readers iterating the registry never see it mutate
+    _registry = {**_registry, name: machine}
+    return machine
+
+
+def get_machine(name: str) -> Optional[TradeStateMachine]:
+    return _registry.get(name)
+
+
+def snapshots() -> List[BotSnapshot]:
+    return [machine.snapshot() for machine in _registry.values()]
+
+
+def unregister(name: str) -> None:
+    global _registry
+    _registry = {k: v for k, v in _registry.items() if k != name}
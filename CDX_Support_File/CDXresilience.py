@@ -0,0 +1,213 @@
+# ========================================
+# File: CDXresilience.py
+# Purpose: Latency budgets, hedged reads and circuit breakers for
+#          CoinDCX REST calls.
+# Notes:   - every call gets a total time budget (no more open-ended waits)
+#          - idempotent reads may be hedged: if the first attempt is slower
+#            than the endpoint's recent p95, a duplicate is fired and the
+#            first response wins
+#          - each endpoint has its own breaker: closed -> open after N
+#            consecutive failures -> half-open single probe after a cooldown
+# ========================================
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+# Defaults
+DEFAULT_BUDGET = 5.0           # seconds, total per call (including hedge)
+HEDGE_MIN_DELAY = 0.25         # never hedge sooner than this
+HEDGE_DEFAULT_DELAY = 1.0      # used until enough latency samples exist
+HEDGE_POOL_SIZE = 8            # per endpoint; abandoned attempts live <= budget
+LATENCY_WINDOW = 200           # samples kept per endpoint
+LATENCY_MIN_SAMPLES = 20
+FAILURE_THRESHOLD = 5          # consecutive failures before opening
+RESET_TIMEOUT = 30.0           # seconds open before a half-open probe
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose breaker is open."""
+
+
+class BudgetExceeded(TimeoutError):
+    """No attempt finished within the call's latency budget."""
+
+
+# -------------------------
+# Latency tracking
+# -------------------------
+class LatencyTracker:
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < LATENCY_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+# -------------------------
+# Circuit breaker
+# -------------------------
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(f"{self.name}: circuit {self.state}")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"🟢 Circuit {self.name} closed")
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"🔴 Circuit {self.name} open ({self.failures} failures)")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+
+# -------------------------
+# Endpoint wrapper
+# -------------------------
+class Endpoint:
+    """
+    One REST endpoint with its own budget, latency history and breaker.
+    `fn(timeout)` performs a single attempt and must honour `timeout`.
+    call(fn, budget) may lower the budget for one call (never raise it).
+    """
+
+    def __init__(self, name: str, budget: float = DEFAULT_BUDGET, hedge: bool = False):
+        self.name = name
+        self.budget = budget
+        self.hedge = hedge
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker(name)
+        self.hedges_fired = 0
+        self._stats_lock = threading.Lock()
+        # Own pool per hedged endpoint, so attempts left running on one slow
+        # endpoint can't queue up new attempts on another.
+        self._executor = ThreadPoolExecutor(max_workers=HEDGE_POOL_SIZE,
+                                            thread_name_prefix=f"cdx-{name}") if hedge else None
+
+    def hedge_delay(self, budget: float) -> float:
+        p95 = self.latency.percentile(0.95)
+        delay = HEDGE_DEFAULT_DELAY if p95 is None else p95
+        return min(max(delay, HEDGE_MIN_DELAY), budget / 2)
+
+    def call(self, fn: Callable[[float], Any], budget: Optional[float] = None) -> Any:
+        budget = self.budget if budget is None else min(self.budget, budget)
+        if budget <= 0:
+            raise BudgetExceeded(f"{self.name}: no budget left for this call")
+        self.breaker.before_call()
+        start = time.monotonic()
+        try:
+            if self.hedge:
+                result = self._call_hedged(fn, start, budget)
+            else:
+                result = fn(budget)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+        # 5xx responses count against the breaker but are still returned
+        if getattr(result, "status_code", 200) >= 500:
+            self.breaker.record_failure()
+        else:
+            self.latency.add(time.monotonic() - start)
+            self.breaker.record_success()
+        return result
+
+    def _call_hedged(self, fn: Callable[[float], Any], start: float, budget: float) -> Any:
+        pending = {self._executor.submit(fn, budget)}
+        done, pending = wait(pending, timeout=self.hedge_delay(budget))
+
+        if not done:
+            remaining = budget - (time.monotonic() - start)
+            if remaining > 0:
+                with self._stats_lock:
+                    self.hedges_fired += 1
+                pending.add(self._executor.submit(fn, remaining))
+
+        error: Optional[BaseException] = None
+        while pending or done:
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+            done = set()
+            if not pending:
+                break
+            remaining = budget - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+
+        if error is not None and not pending:
+            raise error
+        raise BudgetExceeded(f"{self.name}: no response within {budget:.2f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.state,
+            "failures": self.breaker.failures,
+            "p95": self.latency.percentile(0.95),
+            "hedges_fired": self.hedges_fired,
+        }
+
+
+# -------------------------
+# Registry
+# -------------------------
+_endpoints: Dict[str, Endpoint] = {}
+_registry_lock = threading.Lock()
+
+
+def endpoint(name: str, budget: float = DEFAULT_BUDGET, hedge: bool = False) -> Endpoint:
+    """Get (or create on first use) the named endpoint."""
+    with _registry_lock:
+        if name not in _endpoints:
+            _endpoints[name] = Endpoint(name, budget=budget, hedge=hedge)
+        return _endpoints[name]
+
+
+def endpoint_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: ep.stats() for name, ep in list(_endpoints.items())}
@@ -0,0 +1,140 @@
+# ========================================
+# File: CDXriskengine.py
+# Purpose: Vectorised fee / TP-SL model and precomputed sizing table.
+# Notes:   - single source of the fee / sl_mult formulas; the scalar
+#            helpers in CDXMainbotxrp call these, and every argument may
+#            be a numpy array (broadcast together)
+#          - RiskTable precomputes max_quantity() for a grid of
+#            prices x ATRs x leverages; lookup() is O(1) at signal time
+# ========================================
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+FEE_RATE = 0.0005 * 1.18        # 0.05% exchange fee + 18% GST, per side
+
+# sl_mult rule: atr > 0.08 -> 1.0, else 1.5
+SL_MULT_ATR_CUTOFF = 0.08
+SL_MULT_HIGH_ATR = 1.0
+SL_MULT_DEFAULT = 1.5
+
+
+# -------------------------
+# Vectorised formulas
+# -------------------------
+def fee_margin(price, qty, fx):
+    """Fee_margin = (qty × price × FX) × 0.05% × 1.18"""
+    return np.asarray(qty) * price * fx * FEE_RATE
+
+
+def bet_amount(price, qty, leverage, fx):
+    """Bet_amount = ((qty × price × FX) / leverage) + Fee_margin  (margin used, INR)"""
+    return (np.asarray(qty) * price * fx) / leverage + fee_margin(price, qty, fx)
+
+
+def fee_move(price, qty, leverage, fx, roe):
+    """fee_move = roe × bet_amount / qty / fx  (0.0001 where qty or fx is 0)"""
+    qty = np.asarray(qty, dtype=float)
+    fx = np.asarray(fx, dtype=float)
+    valid = (qty != 0) & (fx != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        move = roe * bet_amount(price, qty, leverage, fx) / qty / fx
+    return np.where(valid, move, 0.0001)
+
+
+def sl_multiplier(atr):
+    return np.where(np.asarray(atr) > SL_MULT_ATR_CUTOFF, SL_MULT_HIGH_ATR, SL_MULT_DEFAULT)
+
+
+def sl_move_ceiling(atr):
+    """
+    Largest sl_move (sl_mult × atr) for any ATR <= `atr`. sl_mult drops at
+    the cutoff, so sl_move itself is not monotone in ATR.
+    """
+    atr = np.asarray(atr, dtype=float)
+    return np.maximum(SL_MULT_HIGH_ATR * atr, SL_MULT_DEFAULT * np.minimum(atr, SL_MULT_ATR_CUTOFF))
+
+
+def tpsl_moves(price, atr, qty, leverage, fx, roe, rr_ratio):
+    """
+    Returns (tp_move, sl_move, fee_move) arrays:
+      sl_move = sl_mult × atr
+      tp_move = sl_mult × rr_ratio × atr + fee_move
+    """
+    sl_mult = sl_multiplier(atr)
+    fmove = fee_move(price, qty, leverage, fx, roe)
+    sl_move = sl_mult * atr
+    tp_move = sl_mult * rr_ratio * atr + fmove
+    return tp_move, sl_move, fmove
+
+
+def loss_at_stop(price, atr, qty, fx):
+    """INR lost if the stop is hit: sl_move × qty × FX plus entry + exit fees."""
+    return sl_multiplier(atr) * atr * np.asarray(qty) * fx + 2 * fee_margin(price, qty, fx)
+
+
+def max_quantity(price, atr, leverage, quantities, fx, risk_budget, max_margin):
+    """
+    Largest of `quantities` whose loss_at_stop stays within `risk_budget`
+    and whose bet_amount stays within `max_margin`; 0 where none fits.
+    """
+    return _snap_quantity(quantities, loss_at_stop(price, atr, 1.0, fx),
+                          bet_amount(price, 1.0, leverage, fx), risk_budget, max_margin)
+
+
+def _snap_quantity(quantities, unit_loss, unit_margin, risk_budget, max_margin):
+    quantities = np.sort(np.asarray(quantities, dtype=float))
+    # Loss and margin are linear in qty, so solve for the limit per unit
+    # and snap down to the quantity grid in one searchsorted call.
+    qty_limit = np.minimum(risk_budget / unit_loss, max_margin / unit_margin)
+    # Tolerance so a limit that is exactly a grid quantity (e.g. a budget
+    # calibrated on it) isn't lost to float rounding
+    idx = np.searchsorted(quantities, qty_limit * (1 + 1e-9), side="right") - 1
+    return np.where(idx >= 0, quantities[np.clip(idx, 0, None)], 0.0)
+
+
+# -------------------------
+# Precomputed sizing table
+# -------------------------
+class RiskTable:
+    """
+    Grid of prices x ATRs x leverages holding max_quantity() per cell.
+    TP/SL moves are not tabled: they depend on the actual fill price and
+    are computed after entry. Prices and ATRs are rounded UP to the grid
+    on lookup and cells are sized with sl_move_ceiling(), so table answers
+    are never riskier than the input, wherever the grid falls relative to
+    the sl_mult cutoff (at worst a cell is more conservative than direct).
+    """
+
+    def __init__(self, price_range: Tuple[float, float, float], atr_range: Tuple[float, float, float],
+                 quantities: Sequence[float], leverages: Sequence[float],
+                 fx: float, risk_budget: float, max_margin: float):
+        self.price0, price_max, self.price_step = price_range
+        self.atr0, atr_max, self.atr_step = atr_range
+        self.prices = np.arange(self.price0, price_max + self.price_step / 2, self.price_step)
+        self.atrs = np.arange(self.atr0, atr_max + self.atr_step / 2, self.atr_step)
+        self.leverages = np.asarray(leverages, dtype=float)
+        self._lev_index: Dict[float, int] = {float(lev): i for i, lev in enumerate(self.leverages)}
+
+        # Broadcast shapes: P x A x L
+        p = self.prices[:, None, None]
+        a = self.atrs[None, :, None]
+        lev = self.leverages[None, None, :]
+        unit_loss = sl_move_ceiling(a) * fx + 2 * fee_margin(p, 1.0, fx)
+        self.qty = _snap_quantity(quantities, unit_loss, bet_amount(p, 1.0, lev, fx), risk_budget, max_margin)
+
+    def _index(self, value: float, origin: float, step: float, size: int) -> Optional[int]:
+        i = int(np.ceil((value - origin) / step - 1e-9))
+        return None if i >= size else max(i, 0)
+
+    def lookup(self, price: float, atr: float, leverage: float) -> Optional[float]:
+        """
+        O(1) sizing: returns the cell's quantity, or None if the leverage
+        is not tabled or price / ATR lie above the grid.
+        """
+        li = self._lev_index.get(float(leverage))
+        pi = self._index(price, self.price0, self.price_step, len(self.prices))
+        ai = self._index(atr, self.atr0, self.atr_step, len(self.atrs))
+        if li is None or pi is None or ai is None:
+            return None
+        return float(self.qty[pi, ai, li])
@@ -0,0 +1,232 @@
+# ========================================
+# File: CDXtradejournal.py
+# Purpose: Append-only trade/event journal (SQLite, WAL mode).
+# Notes:   - record() never blocks: events go on a bounded queue and a
+#            background writer thread commits them in batches
+#          - exits also update a per-day summary table in the same
+#            transaction, so running PnL / daily stats are tiny queries
+#          - exit PnL is an estimate (`pnl_est`, with `exit_reason`): the
+#            bot does not fetch the exchange fill, so no confirmed PnL is kept
+# ========================================
+import json
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional
+
+JOURNAL_PATH = os.getenv(
+    "CDX_JOURNAL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cdx_trades.db"),
+)
+
+BATCH_SIZE = 64          # max events per commit
+FLUSH_INTERVAL = 1.0     # seconds the idle writer waits on the queue
+QUEUE_MAX = 10000        # events buffered before record() starts dropping
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts_ms     INTEGER NOT NULL,
+    day       TEXT    NOT NULL,
+    symbol    TEXT    NOT NULL,
+    cycle     INTEGER,
+    kind      TEXT    NOT NULL,
+    side      TEXT,
+    price     REAL,
+    quantity  REAL,
+    atr       REAL,
+    tp_price  REAL,
+    sl_price  REAL,
+    pnl_est   REAL,
+    exit_reason TEXT,
+    details   TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_symbol_kind_ts ON events(symbol, kind, ts_ms);
+CREATE INDEX IF NOT EXISTS idx_events_day ON events(day);
+
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day     TEXT    NOT NULL,
+    symbol  TEXT    NOT NULL,
+    trades  INTEGER NOT NULL DEFAULT 0,
+    wins    INTEGER NOT NULL DEFAULT 0,
+    losses  INTEGER NOT NULL DEFAULT 0,
+    pnl_est REAL    NOT NULL DEFAULT 0,
+    best    REAL,
+    worst   REAL,
+    PRIMARY KEY (day, symbol)
+) WITHOUT ROWID;
+"""
+
+INSERT_EVENT = """
+INSERT INTO events (ts_ms, day, symbol, cycle, kind, side, price, quantity, atr, tp_price, sl_price,
+                    pnl_est, exit_reason, details)
+VALUES (:ts_ms, :day, :symbol, :cycle, :kind, :side, :price, :quantity, :atr, :tp_price, :sl_price,
+        :pnl_est, :exit_reason, :details)
+"""
+
+UPSERT_DAILY = """
+INSERT INTO daily_stats (day, symbol, trades, wins, losses, pnl_est, best, worst)
+VALUES (:day, :symbol, 1, :pnl_est > 0, :pnl_est < 0, :pnl_est, :pnl_est, :pnl_est)
+ON CONFLICT(day, symbol) DO UPDATE SET
+    trades  = trades + 1,
+    wins    = wins + (excluded.pnl_est > 0),
+    losses  = losses + (excluded.pnl_est < 0),
+    pnl_est = pnl_est + excluded.pnl_est,
+    best    = max(best, excluded.best),
+    worst   = min(worst, excluded.worst)
+"""
+
+EVENT_FIELDS = ("cycle", "side", "price", "quantity", "atr", "tp_price", "sl_price",
+                "pnl_est", "exit_reason")
+
+_STOP = object()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=5)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class TradeJournal:
+    """
+    Persistent journal of bot events: signal, fill, tpsl, exit.
+    PnL on 'exit' events is in margin currency (INR).
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH, symbol: str = "XRPUSDT"):
+        self.path = path
+        self.symbol = symbol
+        self.dropped = 0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=QUEUE_MAX)
+
+        # Create schema up front so readers never see a missing table
+        conn = _connect(self.path)
+        conn.executescript(SCHEMA)
+        conn.commit()
+        conn.close()
+
+        self._writer = threading.Thread(target=self._run_writer, name="trade-journal", daemon=True)
+        self._writer.start()
+
+    # --------------------------------------------------------
+    # WRITE SIDE (non-blocking)
+    # --------------------------------------------------------
+    def record(self, kind: str, **fields: Any) -> bool:
+        """
+        Queue an event for the writer thread. Returns False (and counts a drop)
+        if the queue is full; never blocks the caller.
+        """
+        now = datetime.now(timezone.utc)
+        row = {name: fields.pop(name, None) for name in EVENT_FIELDS}
+        row.update({
+            "ts_ms": int(now.timestamp() * 1000),
+            "day": now.astimezone(IST).strftime("%Y-%m-%d"),
+            "symbol": fields.pop("symbol", self.symbol),
+            "kind": kind,
+            "details": json.dumps(fields, default=str) if fields else None,
+        })
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending events and stop the writer thread."""
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._writer.join(timeout)
+
+    def _run_writer(self) -> None:
+        conn = _connect(self.path)
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                continue
+
+            batch: List[Dict[str, Any]] = []
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._commit(conn, batch)
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: List[Dict[str, Any]]) -> None:
+        try:
+            with conn:
+                conn.executemany(INSERT_EVENT, batch)
+                exits = [row for row in batch if row["kind"] == "exit" and row["pnl_est"] is not None]
+                if exits:
+                    conn.executemany(UPSERT_DAILY, exits)
+        except sqlite3.Error as e:
+            self.dropped += len(batch)
+            print(f"⚠️ Trade journal write failed ({len(batch)} events dropped): {e}")
+
+    # --------------------------------------------------------
+    # READ SIDE (own connection per call, safe from any thread)
+    # --------------------------------------------------------
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def running_pnl(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Totals across all recorded exits: estimated `pnl_est` (INR) and
+        number of `trades`.
+        """
+        rows = self._query(
+            "SELECT COALESCE(SUM(pnl_est), 0) AS pnl_est, COALESCE(SUM(trades), 0) AS trades "
+            "FROM daily_stats WHERE symbol = ?",
+            (symbol or self.symbol,),
+        )
+        return dict(rows[0])
+
+    def daily_stats(self, days: int = 30, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-day trades / wins / losses / pnl_est, newest first."""
+        rows = self._query(
+            "SELECT day, trades, wins, losses, pnl_est, best, worst FROM daily_stats "
+            "WHERE symbol = ? ORDER BY day DESC LIMIT ?",
+            (symbol or self.symbol, days),
+        )
+        return [dict(r) for r in rows]
+
+    def recent_events(self, limit: int = 50, kind: Optional[str] = None,
+                      symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recent events, optionally filtered by kind, newest first."""
+        if kind:
+            rows = self._query(
+                "SELECT * FROM events WHERE symbol = ? AND kind = ? ORDER BY ts_ms DESC LIMIT ?",
+                (symbol or self.symbol, kind, limit),
+            )
+        else:
+            rows = self._query(
+                "SELECT * FROM events WHERE symbol = ? ORDER BY id DESC LIMIT ?",
+                (symbol or self.symbol, limit),
+            )
+        return [dict(r) for r in rows]
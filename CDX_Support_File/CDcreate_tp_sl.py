@@ -1,11 +1,8 @@
 # coindcx_tpsl.py
-import hmac
-import hashlib
-import json
-import time
-import requests
 import os
 from dotenv import load_dotenv
+from CDXresilience import endpoint
+from CDXsigner import CLOCK, BodyTemplate, Field, RequestSigner, timed_post
 
 # Load variables from .env
 load_dotenv()
@@ -13,7 +10,25 @@ load_dotenv()
 API_KEY = os.getenv("CD_API_KEY")
 API_SECRET = os.getenv("CD_API_SECRET")
 
-secret_bytes = bytes(API_SECRET, encoding='utf-8')
+SIGNER = RequestSigner(API_KEY, API_SECRET)
+
+URL = "https://api.coindcx.com/exchange/v1/derivatives/futures/positions/create_tpsl"
+
+BODY = BodyTemplate({
+    "timestamp": Field("timestamp"),
+    "id": Field("id"),
+    "take_profit": {
+        "stop_price": Field("tp_price"),
+        "order_type": "take_profit_market"
+    },
+    "stop_loss": {
+        "stop_price": Field("sl_price"),
+        "order_type": "stop_market"
+    }
+})
+
+# Not idempotent: bounded timeout + breaker, never hedged
+TPSL_ENDPOINT = endpoint("create_tpsl", budget=10.0)
 
 def set_tpsl(position_id, tp_price, sl_price):
     """
@@ -24,31 +39,10 @@ def set_tpsl(position_id, tp_price, sl_price):
     :param sl_price: str - Stop loss trigger price
     :return: dict - API response
     """
-    timeStamp = int(round(time.time() * 1000))
-
-    body = {
-        "timestamp": timeStamp,
-        "id": position_id,
-        "take_profit": {
-            "stop_price": tp_price,
-            "order_type": "take_profit_market"
-        },
-        "stop_loss": {
-            "stop_price": sl_price,
-            "order_type": "stop_market"
-        }
-    }
-
-    json_body = json.dumps(body, separators=(',', ':'))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-
-    url = "https://api.coindcx.com/exchange/v1/derivatives/futures/positions/create_tpsl"
-
-    headers = {
-        'Content-Type': 'application/json',
-        'X-AUTH-APIKEY': API_KEY,
-        'X-AUTH-SIGNATURE': signature
-    }
+    json_body = BODY.render(timestamp=CLOCK.now_ms(), id=position_id, tp_price=tp_price, sl_price=sl_price)
+    headers = SIGNER.headers(json_body)
 
-    response = requests.post(url, data=json_body, headers=headers)
+    response = TPSL_ENDPOINT.call(
+        lambda timeout: timed_post(URL, json_body, headers, timeout)
+    )
     return response.json()
\ No newline at end of file
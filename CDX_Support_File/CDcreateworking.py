@@ -1,21 +1,42 @@
 # order_module.py
-import hmac
-import hashlib
-import json
-import time
-import requests
 import os
 from dotenv import load_dotenv
+from CDXresilience import endpoint
+from CDXsigner import CLOCK, BodyTemplate, Field, RequestSigner, timed_post
 
 # Load API keys from .env
 load_dotenv()
 API_KEY = os.getenv("CD_API_KEY")
 API_SECRET = os.getenv("CD_API_SECRET")
-secret_bytes = bytes(API_SECRET, encoding="utf-8")
+SIGNER = RequestSigner(API_KEY, API_SECRET)
 
 # URL for creating futures orders
 URL = "https://api.coindcx.com/exchange/v1/derivatives/futures/orders/create"
 
+# Not idempotent: bounded timeout + breaker, never hedged
+ORDERS_ENDPOINT = endpoint("orders_create", budget=10.0)
+
+# Fixed parts serialised once; only per-order values are encoded per request
+ORDER_BODY = BodyTemplate({
+    "timestamp": Field("timestamp"),
+    "order": {
+        "margin_currency_short_name": "INR",
+        "position_margin_type": "isolated",
+        "side": Field("side"),                   # buy/sell
+        "pair": Field("pair"),                   # e.g., B-XRP_USDT
+        "order_type": Field("order_type"),
+        "price": Field("price"),                 # only needed for limit orders
+        "total_quantity": Field("quantity"),
+        "leverage": Field("leverage"),
+        "notification": "email_notification",
+        "time_in_force": "good_till_cancel",
+        "hidden": False,
+        "post_only": False,
+        "take_profit_price": Field("tp"),
+        "stop_loss_price": Field("sl"),
+    },
+})
+
 def place_orders(orders):
     """
     Place multiple orders on CoinDCX Futures.
@@ -26,38 +47,22 @@ def place_orders(orders):
     results = []
 
     for order in orders:
-        timestamp = int(round(time.time() * 1000))
-
-        body = {
-            "timestamp": timestamp,
-            "order": {
-                "margin_currency_short_name": "INR",
-                "position_margin_type": "isolated",
-                "side": order["side"],                   # buy/sell
-                "pair": order["pair"],                   # e.g., B-XRP_USDT
-                "order_type": order.get("order_type", "limit_order"),  # default: limit_order
-                "price": order.get("price", 0),          # only needed for limit orders
-                "total_quantity": order["quantity"],
-                "leverage": order["leverage"],
-                "notification": "email_notification",
-                "time_in_force": "good_till_cancel",
-                "hidden": False,
-                "post_only": False,
-                "take_profit_price": order.get("tp"),
-                "stop_loss_price": order.get("sl"),
-            },
-        }
-
-        json_body = json.dumps(body, separators=(",", ":"))
-        signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-
-        headers = {
-            "Content-Type": "application/json",
-            "X-AUTH-APIKEY": API_KEY,
-            "X-AUTH-SIGNATURE": signature,
-        }
+        json_body = ORDER_BODY.render(
+            timestamp=CLOCK.now_ms(),
+            side=order["side"],
+            pair=order["pair"],
+            order_type=order.get("order_type", "limit_order"),  # default: limit_order
+            price=order.get("price", 0),
+            quantity=order["quantity"],
+            leverage=order["leverage"],
+            tp=order.get("tp"),
+            sl=order.get("sl"),
+        )
+        headers = SIGNER.headers(json_body)
 
-        response = requests.post(URL, data=json_body, headers=headers)
+        response = ORDERS_ENDPOINT.call(
+            lambda timeout: timed_post(URL, json_body, headers, timeout)
+        )
         try:
             data = response.json()
         except Exception:
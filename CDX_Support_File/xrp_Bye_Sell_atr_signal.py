@@ -1,15 +1,27 @@
 # ============================================================
 # FILE: xrp_Bye_Sell_atr_signal.py  (ONE-SHOT Combo-3 Engine)
 # WebSocket runs until a VALID BUY/SELL + ATR condition met.
+# Pipeline: socket callback (receive) -> decode thread -> evaluate thread,
+#           joined by bounded queues, so indicator work never delays
+#           reading the socket (and its ping/pong).
 # ============================================================
 
 import requests
 import pandas as pd
 import pandas_ta as ta
 import json
+import queue
+import threading
 from websocket import WebSocketApp
 from datetime import datetime
 
+# Optional faster JSON parser
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # ---------- Binance API ----------
 BINANCE_REST = "http://api.binance.com/api/v3/klines"
 BINANCE_WS   = "wss://stream.binance.com:9443/ws/xrpusdt@kline_5m"
@@ -25,6 +37,29 @@ EMA_SLOW = 50
 ATR_PERIOD = 14
 MIN_ATR = 0.005          # IGNORE CANDLES IF ATR BELOW THIS
 
+# ---------- Pipeline ----------
+RAW_QUEUE_SIZE = 256     # undecoded closed-candle frames (receive -> decode)
+CANDLE_QUEUE_SIZE = 32   # closed candles (decode -> evaluate)
+# Closed candles are never dropped: both stages use blocking put(), and the
+# downstream stage always drains until _STOP, so a put can only wait, not hang.
+STAGE_JOIN_TIMEOUT = 30
+
+_STOP = object()
+
+def _is_open_tick(message) -> bool:
+    """Cheap pre-decode check: Binance kline frames carry "x":false until the candle closes."""
+    marker = b'"x":false' if isinstance(message, (bytes, bytearray)) else '"x":false'
+    return marker in message
+
+def add_indicators(df):
+    """MACD, EMAs, ATR and rolling MAX_ATR, appended in place."""
+    df.ta.macd(fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL, append=True)
+    df[f"ema{EMA_FAST}"] = df["close"].ewm(span=EMA_FAST, adjust=False).mean()
+    df[f"ema{EMA_SLOW}"] = df["close"].ewm(span=EMA_SLOW, adjust=False).mean()
+    df["ATR"] = ta.atr(df["high"], df["low"], df["close"], length=ATR_PERIOD)
+    df["MAX_ATR"] = df["ATR"].rolling(ATR_PERIOD).max()
+    return df
+
 # ============================================================
 # ONE-SHOT LIVE SIGNAL ENGINE
 # ============================================================
@@ -40,6 +75,11 @@ class DataEngine:
 
         self.done = False
 
+        # Pipeline state
+        self._raw_q = queue.Queue(maxsize=RAW_QUEUE_SIZE)
+        self._candle_q = queue.Queue(maxsize=CANDLE_QUEUE_SIZE)
+        self.skipped_ticks = 0       # open-candle frames dropped at receive
+
     # --------------------------------------------------------
     def load_historical(self, limit=500):
 
@@ -62,29 +102,63 @@ class DataEngine:
         df = df[["open","high","low","close","volume"]].astype(float)
 
         # --- indicators ---
-        df.ta.macd(fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL, append=True)
-        df[f"ema{EMA_FAST}"] = df["close"].ewm(span=EMA_FAST, adjust=False).mean()
-        df[f"ema{EMA_SLOW}"] = df["close"].ewm(span=EMA_SLOW, adjust=False).mean()
-
-        df["ATR"] = ta.atr(df["high"], df["low"], df["close"], length=ATR_PERIOD)
-        df["MAX_ATR"] = df["ATR"].rolling(ATR_PERIOD).max()
-
-        self.df = df
+        self.df = add_indicators(df)
 
     # --------------------------------------------------------
-    # WEBSOCKET HANDLER
+    # STAGE 1: RECEIVE (websocket callback thread - enqueue only)
     # --------------------------------------------------------
     def on_message(self, ws, message):
 
         if self.done:
             return
 
-        data = json.loads(message)
-        k = data["k"]
-
-        # Only closed candle
-        if not k["x"]:
+        # Signals only use closed candles, so open-candle ticks are dropped
+        # here without decoding. Anything else (closed or unrecognised) is
+        # queued; put() only waits if 256 closed candles are backed up.
+        if _is_open_tick(message):
+            self.skipped_ticks += 1
             return
+        self._raw_q.put(message)
+
+    # --------------------------------------------------------
+    # STAGE 2: DECODE (JSON -> closed kline dicts)
+    # --------------------------------------------------------
+    def _decode_loop(self):
+        while True:
+            message = self._raw_q.get()
+            if message is _STOP:
+                return
+            if self.done:
+                continue
+
+            try:
+                k = _json_loads(message)["k"]
+                # Open tick the cheap check missed (e.g. different spacing)
+                if not k["x"]:
+                    continue
+            except Exception as e:
+                print("⚠️ Undecodable frame:", e)
+                continue
+
+            # Closed candle: must reach the evaluator, wait for room
+            self._candle_q.put(k)
+
+    # --------------------------------------------------------
+    # STAGE 3: EVALUATE (indicators + signal on closed candles)
+    # --------------------------------------------------------
+    def _evaluate_loop(self, ws):
+        while True:
+            k = self._candle_q.get()
+            if k is _STOP:
+                return
+            if self.done:
+                continue
+            try:
+                self.evaluate_candle(ws, k)
+            except Exception as e:
+                print("❌ Signal evaluation error:", e)
+
+    def evaluate_candle(self, ws, k):
 
         ts = pd.to_datetime(k["T"], unit="ms")
 
@@ -98,11 +172,7 @@ class DataEngine:
         self.df = pd.concat([self.df.iloc[1:], new_row])
 
         # Recalculate indicators
-        self.df.ta.macd(fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL, append=True)
-        self.df[f"ema{EMA_FAST}"] = self.df["close"].ewm(span=EMA_FAST, adjust=False).mean()
-        self.df[f"ema{EMA_SLOW}"] = self.df["close"].ewm(span=EMA_SLOW, adjust=False).mean()
-        self.df["ATR"] = ta.atr(self.df["high"], self.df["low"], self.df["close"], length=ATR_PERIOD)
-        self.df["MAX_ATR"] = self.df["ATR"].rolling(ATR_PERIOD).max()
+        add_indicators(self.df)
 
         last = self.df.iloc[-1]
         prev = self.df.iloc[-2]
@@ -162,8 +232,21 @@ class DataEngine:
             on_close=self.on_close
         )
 
+        decoder = threading.Thread(target=self._decode_loop, name="ws-decode", daemon=True)
+        evaluator = threading.Thread(target=self._evaluate_loop, args=(self.ws,), name="ws-evaluate", daemon=True)
+        decoder.start()
+        evaluator.start()
+
         # Wait until BUY/SELL found
-        self.ws.run_forever(ping_interval=30, ping_timeout=10)
+        try:
+            self.ws.run_forever(ping_interval=30, ping_timeout=10)
+        finally:
+            # Stop stages in order; _STOP queues behind any pending candles,
+            # so each is evaluated (or skipped once a signal has been found)
+            self._raw_q.put(_STOP)
+            decoder.join(STAGE_JOIN_TIMEOUT)
+            self._candle_q.put(_STOP)
+            evaluator.join(STAGE_JOIN_TIMEOUT)
 
         # Return results
         return self.final_signal, self.final_price, self.final_atr
\ No newline at end of file
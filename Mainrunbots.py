@@ -1,8 +1,13 @@
-from flask import Flask
+import time
+
+PROCESS_START = time.monotonic()
+
 import threading
 import sys
 import os
 
+from flask import Flask, Response, abort, jsonify
+
 app = Flask(__name__)
 
 # Add bot folders to path
@@ -12,29 +17,155 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 # sys.path.append(os.path.join(current_dir, "ProjectDEX"))
 
 sys.path.append(os.path.join(current_dir, "Xrp_bot_code"))
+sys.path.append(os.path.join(current_dir, "CDX_Support_File"))
+
+# Lightweight: only the state snapshots, no exchange / pandas imports
+import CDXbotstate as botstate
+import CDXresilience as resilience
+
+# HTTP server (waitress) settings
+HTTP_HOST = "0.0.0.0"
+HTTP_PORT = int(os.getenv("PORT", "8080"))
+HTTP_THREADS = 4
+HTTP_CHANNEL_TIMEOUT = 30     # seconds an idle/slow connection may hold a worker
 
-# Import the main function
-from CDXMainbotxrp import main as cdx_main
+# Startup tracking: "/" answers as soon as waitress listens, "/ready" only
+# once the bot module (and with it pandas / the signal engine) is imported.
+STARTUP_TIMINGS = {"module_loaded": round(time.monotonic() - PROCESS_START, 3)}
+ENGINE_READY = threading.Event()
+STARTUP_ERROR = None     # bot import / warm-up failed
+RUNTIME_ERROR = None     # bot crashed after it was ready
+
+def mark_timing(stage: str, since: float) -> None:
+    STARTUP_TIMINGS[stage] = round(time.monotonic() - since, 3)
+    print(f"⏱️ Startup: {stage} took {STARTUP_TIMINGS[stage]}s")
 
 def run_cdx_bot():
+    global STARTUP_ERROR, RUNTIME_ERROR
+    try:
+        # Heavy imports happen here, off the serving thread
+        t0 = time.monotonic()
+        import CDXMainbotxrp
+        mark_timing("bot_import", t0)
+    except Exception as e:
+        STARTUP_ERROR = str(e)
+        print(f"❌ CDX Bot startup error: {e}")
+        return
+
+    mark_timing("ready_after", PROCESS_START)
+    ENGINE_READY.set()
     try:
-        cdx_main()
+        CDXMainbotxrp.main()
     except Exception as e:
+        RUNTIME_ERROR = str(e)
         print(f"❌ CDX Bot Error: {e}")
+    finally:
+        ENGINE_READY.clear()
 
 @app.route('/')
 def health_check():
     return 'Bot is running', 200
 
+@app.route('/ready')
+def readiness_check():
+    body = {
+        "ready": ENGINE_READY.is_set(),
+        "uptime": round(time.monotonic() - PROCESS_START, 3),
+        "timings": STARTUP_TIMINGS,
+    }
+    if STARTUP_ERROR:
+        body["startup_error"] = STARTUP_ERROR
+    if RUNTIME_ERROR:
+        body["runtime_error"] = RUNTIME_ERROR
+    return jsonify(body), (200 if body["ready"] else 503)
+
+# -------------------------
+# Read-only bot state (served from immutable snapshots; never touches the trading thread)
+# -------------------------
+def snapshot_dict(snap) -> dict:
+    data = snap.to_dict()
+    data["phase_age"] = round(time.time() - snap.phase_since, 3)
+    return data
+
+@app.route('/status')
+def status_all():
+    return jsonify({
+        "ready": ENGINE_READY.is_set(),
+        "uptime": round(time.monotonic() - PROCESS_START, 3),
+        "bots": [snapshot_dict(snap) for snap in botstate.snapshots()],
+    })
+
+@app.route('/status/<name>')
+def status_bot(name):
+    machine = botstate.get_machine(name)
+    if machine is None:
+        abort(404)
+    return jsonify(snapshot_dict(machine.snapshot()))
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of startup and per-bot state."""
+    lines = [
+        "# TYPE cdx_up gauge",
+        "cdx_up 1",
+        "# TYPE cdx_engine_ready gauge",
+        f"cdx_engine_ready {int(ENGINE_READY.is_set())}",
+        "# TYPE cdx_uptime_seconds gauge",
+        f"cdx_uptime_seconds {time.monotonic() - PROCESS_START:.3f}",
+        "# TYPE cdx_startup_seconds gauge",
+    ]
+    for stage, seconds in list(STARTUP_TIMINGS.items()):
+        lines.append(f'cdx_startup_seconds{{stage="{stage}"}} {seconds}')
+
+    snaps = botstate.snapshots()
+    gauges = {
+        "cdx_bot_phase_age_seconds": lambda s: round(time.time() - s.phase_since, 3),
+        "cdx_bot_active_position": lambda s: s.position.active_pos,
+        "cdx_bot_entry_price": lambda s: s.position.entry_price,
+        "cdx_bot_price": lambda s: s.position.price,
+        "cdx_bot_cumulative_pnl_est": lambda s: s.cumulative_pnl_est,
+        "cdx_bot_cycle_step": lambda s: s.cycle_step,
+        "cdx_bot_state_version": lambda s: s.version,
+    }
+    lines.append("# TYPE cdx_bot_phase gauge")
+    for snap in snaps:
+        for phase in botstate.TRANSITIONS:
+            lines.append(f'cdx_bot_phase{{bot="{snap.bot}",phase="{phase}"}} {int(snap.phase == phase)}')
+    for metric, value in gauges.items():
+        lines.append(f"# TYPE {metric} gauge")
+        for snap in snaps:
+            lines.append(f'{metric}{{bot="{snap.bot}"}} {value(snap)}')
+
+    rest = resilience.endpoint_stats()
+    lines.append("# TYPE cdx_rest_breaker_open gauge")
+    for name, st in rest.items():
+        lines.append(f'cdx_rest_breaker_open{{endpoint="{name}"}} {int(st["breaker"] != resilience.CLOSED)}')
+    lines.append("# TYPE cdx_rest_latency_p95_seconds gauge")
+    for name, st in rest.items():
+        if st["p95"] is not None:
+            lines.append(f'cdx_rest_latency_p95_seconds{{endpoint="{name}"}} {st["p95"]:.3f}')
+    lines.append("# TYPE cdx_rest_hedges_total counter")
+    for name, st in rest.items():
+        lines.append(f'cdx_rest_hedges_total{{endpoint="{name}"}} {st["hedges_fired"]}')
+
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
 def run_flask():
-    app.run(host='0.0.0.0', port=8080)
+    # Production WSGI server: fixed worker threads with connection timeouts,
+    # instead of the Flask development server. create_server() binds and
+    # listens before returning, so "http_listening" is when "/" can answer.
+    from waitress import create_server
+    server = create_server(app, host=HTTP_HOST, port=HTTP_PORT, threads=HTTP_THREADS,
+                           channel_timeout=HTTP_CHANNEL_TIMEOUT, ident="cdx-bot")
+    mark_timing("http_listening", PROCESS_START)
+    server.run()
 
 if __name__ == "__main__":
     # Start the bot in a separate thread
     t2 = threading.Thread(target=run_cdx_bot)
     t2.start()
 
-    # Run Flask server in the main thread
+    # Serve HTTP control plane in the main thread
     run_flask()
 
-    t2.join()
\ No newline at end of file
+    t2.join()
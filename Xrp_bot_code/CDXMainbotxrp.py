@@ -13,7 +13,7 @@ import time
 import math
 import traceback
 from datetime import datetime, timezone, timedelta
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 
 # --- FIX PYTHON PATH FOR SUPPORT FILES ---
 import os, sys
@@ -36,8 +36,13 @@ if SUPPORT_DIR not in sys.path:
 from CDXPOdata import get_xrp_data
 from CDcreateworking import place_orders
 from CDcreate_tp_sl import set_tpsl
+from CDXtradejournal import TradeJournal
+import CDXbotstate as botstate
+import CDXriskengine as riskengine   # fee / sl_mult formulas (numpy; pandas loads it anyway)
 
-# One-shot signal engine (must be the Option-1 engine file)
+# One-shot signal engine (must be the Option-1 engine file).
+# Pulls in pandas / pandas_ta / websocket; Mainrunbots imports this module off
+# the HTTP serving thread, so that cost never delays "/".
 from xrp_Bye_Sell_atr_signal import DataEngine
 
 # -------------------------
@@ -81,7 +86,7 @@ CDX_PAIR_ID = "B-XRP_USDT"
 CDX_POSITION_ID = "b915ec98-8115-11f0-982a-67144ee3c0bc"
 
 # Trading / staking
-FIXED_QUANTITY = 3.5        # fixed for now (dynamic qty commented)
+FIXED_QUANTITY = 3.5        # used unless DYNAMIC_QUANTITY is on
 CDX_LEVERAGE = 60
 BASE_STEP = 15
 STEP_INCREMENT = 5
@@ -97,94 +102,36 @@ RR_RATIO = BASE_TP_MULT / BASE_SL_MULT  # 1.666...
 FX = 96
 ROE = 0.07
 
+# Dynamic position sizing (opt-in; off -> always FIXED_QUANTITY)
+# Budgets are calibrated to FIXED_QUANTITY at a reference price / ATR, so at
+# that point risk per trade is unchanged (~6 INR); calmer markets size up,
+# more volatile ones size down (or skip the signal if even 1.0 is too much).
+DYNAMIC_QUANTITY = False
+QTY_CHOICES = tuple(q / 2 for q in range(2, 41))   # 1.0 .. 20.0 step 0.5
+RISK_REFERENCE_PRICE = 2.5
+RISK_REFERENCE_ATR = 0.01
+MAX_QTY_MULTIPLE = 2        # margin cap: this × the fixed-size margin at the reference price
+RISK_BUDGET_INR = float(riskengine.loss_at_stop(RISK_REFERENCE_PRICE, RISK_REFERENCE_ATR, FIXED_QUANTITY, FX))
+MAX_MARGIN_INR = float(riskengine.bet_amount(RISK_REFERENCE_PRICE, MAX_QTY_MULTIPLE * FIXED_QUANTITY,
+                                             CDX_LEVERAGE, FX))
+RISK_PRICE_GRID = (0.1, 5.0, 0.005)     # (min, max, step)
+RISK_ATR_GRID = (0.0, 0.2, 0.0005)
+
 # Volatility filter
 MIN_MAX_ATR_ENTRY = 0.005
 
 # Timeouts & retries
 MAX_API_RETRIES = 5
 RETRY_DELAY = 5
+POSITION_READ_DEADLINE = 10   # hard cap on update_position: each attempt's budget is the time left
+READ_RETRY_DELAY = 1
+MIN_READ_BUDGET = 2           # don't start an attempt with less time left than this
 SET_TPSL_TIMEOUT = 120
 POLL_INTERVAL = 5
 REQUIRED_CLOSED_CHECKS = 5
 
 # -------------------------
-# BLOCK 3: Globals (state)
-# -------------------------
-CDX_active_position: float = 0.0
-CDX_pos_entry_price: float = 0.0
-CDX_pos_take_profit: float = 0.0
-CDX_pos_stop_loss: float = 0.0
-xrp_current_price: float = 0.0
-
-# Running trackers
-CDX_cumulative_pnl: float = 0.0
-cycle_step: int = 1
-
-# -------------------------
-# BLOCK 4: Exchange helpers
-# -------------------------
-def update_position_globals(is_initial_check: bool = False) -> bool:
-    """
-    Query exchange (get_xrp_data) and update globals.
-    Retries internally; raises on persistent failure.
-    """
-    global CDX_active_position, CDX_pos_entry_price, CDX_pos_take_profit, CDX_pos_stop_loss, xrp_current_price
-
-    for attempt in range(1, MAX_API_RETRIES + 1):
-        try:
-            data = get_xrp_data()
-            CDX_active_position = float(data.get("active_pos", 0.0))
-            CDX_pos_entry_price = round(float(data.get("avg_price", 0.0)), 4)
-            CDX_pos_take_profit = round(float(data.get("take_profit", 0.0)), 4)
-            CDX_pos_stop_loss = round(float(data.get("stop_loss", 0.0)), 4)
-            xrp_current_price = round(float(data.get("XRPCurentPrice", 0.0)), 4)
-
-            role = "info"
-            status = "ACTIVE" if abs(CDX_active_position) > 0.00001 else "NO_POS"
-            color_line(f"{'INIT' if is_initial_check else 'DATA'} | ActivePos: {CDX_active_position} | Entry: {CDX_pos_entry_price} | TP: {CDX_pos_take_profit} | SL: {CDX_pos_stop_loss} | Price: {xrp_current_price} | Status:{status}", role=status.lower())
-            return True
-
-        except Exception as e:
-            color_line(f"get_xrp_data failed (attempt {attempt}/{MAX_API_RETRIES}): {e}", role="info")
-            time.sleep(RETRY_DELAY)
-            if attempt == MAX_API_RETRIES:
-                raise
-    return False
-
-def place_market_order_and_confirm(side: str) -> bool:
-    """
-    Place a market order. Wait briefly and confirm an active position exists.
-    """
-    order_payload = [{
-        "side": side.lower(),
-        "pair": CDX_PAIR_ID,
-        "quantity": FIXED_QUANTITY,
-        "leverage": CDX_LEVERAGE,
-        "order_type": "market_order",
-    }]
-
-    color_line(f"Placing Market Order -> {order_payload}", role=side.lower())
-    for attempt in range(1, MAX_API_RETRIES + 1):
-        try:
-            resp = place_orders(order_payload)
-            color_line(f"Order response: {resp}", role="info")
-            time.sleep(20)  # settle time
-            update_position_globals()
-            if abs(CDX_active_position) > 0.00001:
-                color_line("Market order confirmed (active position detected).", role=side.lower())
-                return True
-            else:
-                color_line("No active position detected after order; retrying.", role="info")
-                time.sleep(RETRY_DELAY)
-        except Exception as e:
-            color_line(f"place_orders failed (attempt {attempt}): {e}", role="info")
-            traceback.print_exc()
-            time.sleep(RETRY_DELAY)
-    color_line("Failed to place/confirm market order.", role="info")
-    return False
-
-# -------------------------
-# BLOCK 5: Fee & TP/SL Calculations
+# BLOCK 3: Fee & TP/SL Calculations
 # -------------------------
 def calculate_fee_move_from_fixed_qty(price: float, fixed_qty: float, leverage: float, fx: float, roe: float) -> float:
     """
@@ -193,21 +140,16 @@ def calculate_fee_move_from_fixed_qty(price: float, fixed_qty: float, leverage:
     2) Bet_amount = (( fixed_qty × price × FX ) / leverage ) + Fee_margin
     3) fee = roe × bet_amount
     4) fee_move = fee / fixed_qty / fx
+    Formulas live in CDXriskengine (shared with the sizing table).
     """
-    fee_margin = (fixed_qty * price * fx) * 0.0005 * 1.18     # 0.05% -> 0.0005
-    bet_amount = ((fixed_qty * price * fx) / leverage) + fee_margin
-    fee = roe * bet_amount
-    if fixed_qty == 0 or fx == 0:
-        return 0.0001
-    fee_move = fee / fixed_qty / fx
-    return fee_move
-
-def compute_tpsl_from_atr_and_fee(entry_price: float, atr_value: float, side: str) -> Tuple[float, float, Dict[str, Any]]:
+    return float(riskengine.fee_move(price, fixed_qty, leverage, fx, roe))
+
+def compute_tpsl_from_atr_and_fee(entry_price: float, atr_value: float, side: str,
+                                  quantity: float = FIXED_QUANTITY, leverage: float = CDX_LEVERAGE) -> Tuple[float, float, Dict[str, Any]]:
     """
     Compute TP & SL using ATR multipliers and fee_move.
-    Rules:
+    Rules (see riskengine.sl_multiplier):
       - if atr > 0.08 -> sl_mult = 1.0
-      - if 0.05 <= atr <= 0.08 -> sl_mult = 1.5
       - else -> sl_mult = 1.5
       tp_mult = sl_mult * RR_RATIO
       tp_move includes fee_move
@@ -216,18 +158,10 @@ def compute_tpsl_from_atr_and_fee(entry_price: float, atr_value: float, side: st
     if atr_value is None or math.isnan(atr_value):
         raise ValueError("Invalid ATR for TP/SL calculation")
 
-    if atr_value > 0.08:
-        sl_mult = 1.0
-    elif 0.05 <= atr_value <= 0.08:
-        sl_mult = 1.5
-    else:
-        sl_mult = 1.5
-
+    sl_mult = float(riskengine.sl_multiplier(atr_value))
     tp_mult = sl_mult * RR_RATIO
-    fee_move = calculate_fee_move_from_fixed_qty(entry_price, FIXED_QUANTITY, CDX_LEVERAGE, FX, ROE)
-
-    sl_move = sl_mult * atr_value
-    tp_move = (tp_mult * atr_value) + fee_move
+    tp_move, sl_move, fee_move = (float(move) for move in riskengine.tpsl_moves(
+        entry_price, atr_value, quantity, leverage, FX, ROE, RR_RATIO))
 
     if side.upper() == "BUY":
         tp_price = round(entry_price + tp_move, 4)
@@ -248,175 +182,452 @@ def compute_tpsl_from_atr_and_fee(entry_price: float, atr_value: float, side: st
     }
     return tp_price, sl_price, details
 
-# -------------------------
-# BLOCK 6: TP/SL Placement & Verification
-# -------------------------
-def attempt_set_tpsl(tp_price: float, sl_price: float) -> bool:
+def estimate_exit_price(side: str, tp_price: float, sl_price: float, last_price: float) -> Tuple[float, str]:
     """
-    Call set_tpsl and return True on success (no exception).
+    Best-effort exit price (the exchange close/fill is not fetched). TP or SL
+    is only assumed if the last price seen while the position was open had
+    already reached it; otherwise the exit is booked at that last price.
+    Returns (price, exit_reason).
     """
-    try:
-        set_tpsl(CDX_POSITION_ID, tp_price, sl_price)
-        color_line(f"Called set_tpsl -> TP: {tp_price}, SL: {sl_price}", role="info")
-        return True
-    except Exception as e:
-        color_line(f"set_tpsl error: {e}", role="info")
-        traceback.print_exc()
-        return False
-
-def verify_and_retry_tpsl(side: str, tp_price: float, sl_price: float) -> bool:
-    """
-    Verify TP/SL are present on exchange; retry missing ones until timeout.
-    """
-    color_line(f"Verifying TP/SL (timeout {SET_TPSL_TIMEOUT}s)...", role="info")
-    start = time.time()
-    while time.time() - start < SET_TPSL_TIMEOUT:
-        try:
-            update_position_globals()
-        except Exception as e:
-            color_line(f"get_xrp_data error during TP/SL verification: {e}", role="info")
-            time.sleep(POLL_INTERVAL)
-            continue
-
-        tp_missing = abs(CDX_pos_take_profit) < 0.00001
-        sl_missing = abs(CDX_pos_stop_loss) < 0.00001
-
-        if not tp_missing and not sl_missing:
-            color_line(f"TP ({CDX_pos_take_profit}) and SL ({CDX_pos_stop_loss}) confirmed.", role="info")
-            return True
-
-        # Attempt to set missing ones
-        tp_to_send = tp_price if tp_missing else 0.0
-        sl_to_send = sl_price if sl_missing else 0.0
-        target = "BOTH" if tp_missing and sl_missing else ("TP" if tp_missing else "SL")
-
-        color_line(f"Missing -> TP:{tp_missing}, SL:{sl_missing}. Retrying set ({target})", role="info")
-        attempt_set_tpsl(tp_to_send, sl_to_send)
-        time.sleep(POLL_INTERVAL)
-
-    color_line("TP/SL verification timed out.", role="info")
-    return False
+    long = side.upper() == "BUY"
+    if tp_price and tp_price > 0 and (last_price >= tp_price if long else last_price <= tp_price):
+        return tp_price, "tp_est"
+    if sl_price and sl_price > 0 and (last_price <= sl_price if long else last_price >= sl_price):
+        return sl_price, "sl_est"
+    return last_price, "last_price_est"
+
+def compute_trade_pnl(side: str, entry_price: float, exit_price: float, qty: float, fx: float) -> float:
+    """PnL in margin currency (INR) between two prices, before fees."""
+    direction = 1.0 if side.upper() == "BUY" else -1.0
+    return round((exit_price - entry_price) * direction * qty * fx, 2)
 
 # -------------------------
-# BLOCK 7: Position Monitoring
+# BLOCK 4: Bot instance & state
 # -------------------------
-def wait_for_position_close() -> bool:
+class CDXBot:
     """
-    Wait until exchange reports no active position and confirm it REQUIRED_CLOSED_CHECKS times.
+    One trading bot. All mutable state lives in its TradeStateMachine
+    (see CDXbotstate), so several bots can share a process and other
+    threads can read live status via botstate.snapshots().
     """
-    global CDX_active_position
-    color_line("Waiting for position to close (5x confirmation)...", role="info")
-    consecutive = 0
-    while consecutive < REQUIRED_CLOSED_CHECKS:
-        try:
-            update_position_globals()
-        except Exception as e:
-            color_line(f"get_xrp_data failed while waiting for close: {e}", role="info")
-            consecutive = 0
-            time.sleep(POLL_INTERVAL)
-            continue
-
-        if abs(CDX_active_position) < 0.00001:
-            consecutive += 1
-            color_line(f"Closure confirmation {consecutive}/{REQUIRED_CLOSED_CHECKS}", role="info")
-        else:
-            if consecutive > 0:
-                color_line("Position re-detected active; resetting confirmation count", role="info")
-            consecutive = 0
-        time.sleep(POLL_INTERVAL)
-    color_line("Position confirmed closed.", role="info")
-    return True
 
-# -------------------------
-# BLOCK 8: Main Execution Flow
-# -------------------------
-def main():
-    color_line("--- BOT STARTUP ---", role="info")
-    while True:
-        try:
-            # 1) Check current position
+    def __init__(self, name: str = SYMBOL, symbol: str = SYMBOL, pair_id: str = CDX_PAIR_ID,
+                 position_id: str = CDX_POSITION_ID, quantity: float = FIXED_QUANTITY,
+                 leverage: float = CDX_LEVERAGE, fetch_position=get_xrp_data,
+                 dynamic_quantity: bool = DYNAMIC_QUANTITY):
+        self.name = name
+        self.symbol = symbol
+        self.pair_id = pair_id
+        self.position_id = position_id
+        self.quantity = quantity
+        self.leverage = leverage
+        self.fetch_position = fetch_position
+        self.dynamic_quantity = dynamic_quantity
+        self.risk_table = None
+
+        self.state = botstate.TradeStateMachine(name, symbol)
+        self.journal: Optional[TradeJournal] = None
+
+    @property
+    def position(self) -> botstate.PositionState:
+        return self.state.position
+
+    def journal_event(self, kind: str, **fields: Any) -> None:
+        """Queue a journal event (non-blocking; no-op if journal disabled)."""
+        if self.journal is not None:
+            self.journal.record(kind, symbol=self.symbol, cycle=self.state.snapshot().cycle_step, **fields)
+
+    def build_risk_table(self) -> None:
+        """Precompute the sizing table (only needed with dynamic quantity)."""
+        t0 = time.monotonic()
+        self.risk_table = riskengine.RiskTable(RISK_PRICE_GRID, RISK_ATR_GRID, QTY_CHOICES, (self.leverage,),
+                                               fx=FX, risk_budget=RISK_BUDGET_INR, max_margin=MAX_MARGIN_INR)
+        color_line(f"Risk table ready: {self.risk_table.qty.size} cells in {time.monotonic() - t0:.3f}s", role="info")
+
+    def size_position(self, price: float, atr: float) -> float:
+        """
+        Quantity for this trade: the fixed quantity, or if dynamic the
+        largest QTY_CHOICES size within the risk / margin budget (0 if none).
+        The table answers in O(1); signals outside its grid (or a missing
+        table) are sized with the same formulas directly.
+        """
+        if not self.dynamic_quantity:
+            return self.quantity
+        if self.risk_table is not None:
+            quantity = self.risk_table.lookup(price, atr, self.leverage)
+            if quantity is not None:
+                return quantity
+        return float(riskengine.max_quantity(price, atr, self.leverage, QTY_CHOICES, FX,
+                                             RISK_BUDGET_INR, MAX_MARGIN_INR))
+
+    # -------------------------
+    # BLOCK 5: Exchange helpers
+    # -------------------------
+    def update_position(self, is_initial_check: bool = False) -> bool:
+        """
+        Query exchange (get_xrp_data) and publish a new position state.
+        Retries within POSITION_READ_DEADLINE (total, including the reads
+        themselves); raises on persistent failure.
+        """
+        deadline = time.monotonic() + POSITION_READ_DEADLINE
+        attempt = 0
+        while True:
+            attempt += 1
             try:
-                update_position_globals(is_initial_check=True)
-            except Exception as e:
-                color_line(f"Initial get_xrp_data failed: {e}", role="info")
-                time.sleep(10)
-                continue
-
-            # If non-zero, wait until closed (skip engine)
-            if abs(CDX_active_position) > 0.00001:
-                color_line("Active position detected on startup. Monitoring until closed.", role="info")
-                wait_for_position_close()
-                continue
+                data = self.fetch_position(budget=deadline - time.monotonic())
+                active_pos = float(data.get("active_pos", 0.0))
+                price = round(float(data.get("XRPCurentPrice", 0.0)), 4)
+                last_active_price = self.position.last_active_price
+                if abs(active_pos) > 0.00001 and price > 0:
+                    last_active_price = price
+
+                pos = self.state.update_position(
+                    active_pos=active_pos,
+                    entry_price=round(float(data.get("avg_price", 0.0)), 4),
+                    take_profit=round(float(data.get("take_profit", 0.0)), 4),
+                    stop_loss=round(float(data.get("stop_loss", 0.0)), 4),
+                    price=price,
+                    last_active_price=last_active_price,
+                ).position
+
+                status = "ACTIVE" if pos.is_open else "NO_POS"
+                color_line(f"{'INIT' if is_initial_check else 'DATA'} | ActivePos: {pos.active_pos} | Entry: {pos.entry_price} | TP: {pos.take_profit} | SL: {pos.stop_loss} | Price: {pos.price} | Status:{status}", role=status.lower())
+                return True
 
-            # 2) Position zero -> start one-shot engine
-            color_line("Position zero confirmed. Starting one-shot live engine for next valid signal...", role="info")
-            engine = DataEngine()
+            except Exception as e:
+                remaining = deadline - time.monotonic()
+                color_line(f"get_xrp_data failed (attempt {attempt}, {max(remaining, 0.0):.1f}s left): {e}", role="info")
+                if remaining - READ_RETRY_DELAY < MIN_READ_BUDGET:
+                    raise
+                time.sleep(READ_RETRY_DELAY)
+
+    def await_position_read(self, context: str) -> None:
+        """
+        Poll until the exchange position can be read. Used where acting on an
+        unknown position is unsafe (e.g. an order may have filled).
+        """
+        failed = False
+        while True:
             try:
-                engine.load_historical(limit=500)
+                self.update_position()
+                if failed:
+                    self.state.update(last_error=None)
+                return
             except Exception as e:
-                color_line(f"Failed to load historical candles: {e}", role="info")
-                time.sleep(10)
-                continue
+                failed = True
+                color_line(f"Position unreadable {context} ({e}); polling again in {POLL_INTERVAL}s", role="info")
+                self.state.update(last_error=f"position unreadable {context}: {e}")
+                time.sleep(POLL_INTERVAL)
+
+    def place_market_order_and_confirm(self, side: str, quantity: float) -> bool:
+        """
+        Place a market order. Wait briefly and confirm an active position exists.
+        """
+        order_payload = [{
+            "side": side.lower(),
+            "pair": self.pair_id,
+            "quantity": quantity,
+            "leverage": self.leverage,
+            "order_type": "market_order",
+        }]
+
+        color_line(f"Placing Market Order -> {order_payload}", role=side.lower())
+        for attempt in range(1, MAX_API_RETRIES + 1):
+            try:
+                resp = place_orders(order_payload)
+                color_line(f"Order response: {resp}", role="info")
+            except Exception as e:
+                # Order create is not idempotent: a timed-out request may still
+                # have filled, so never re-post before checking the position.
+                color_line(f"place_orders failed (attempt {attempt}): {e} -> checking position before any retry", role="info")
+                traceback.print_exc()
+
+            time.sleep(20)  # settle time
+            # An order may be live: stay in ENTERING until the position is known
+            self.await_position_read("after order")
 
+            if self.position.is_open:
+                color_line("Market order confirmed (active position detected).", role=side.lower())
+                return True
+            color_line("Exchange reports no active position after order; retrying.", role="info")
+            time.sleep(RETRY_DELAY)
+        color_line("Failed to place/confirm market order.", role="info")
+        return False
+
+    # -------------------------
+    # BLOCK 6: TP/SL Placement & Verification
+    # -------------------------
+    def attempt_set_tpsl(self, tp_price: float, sl_price: float) -> bool:
+        """
+        Call set_tpsl and return True on success (no exception).
+        """
+        try:
+            set_tpsl(self.position_id, tp_price, sl_price)
+            color_line(f"Called set_tpsl -> TP: {tp_price}, SL: {sl_price}", role="info")
+            return True
+        except Exception as e:
+            color_line(f"set_tpsl error: {e}", role="info")
+            traceback.print_exc()
+            return False
+
+    def verify_and_retry_tpsl(self, side: str, tp_price: float, sl_price: float) -> bool:
+        """
+        Verify TP/SL are present on exchange; retry missing ones until timeout.
+        """
+        color_line(f"Verifying TP/SL (timeout {SET_TPSL_TIMEOUT}s)...", role="info")
+        start = time.time()
+        while time.time() - start < SET_TPSL_TIMEOUT:
             try:
-                signal, sig_price, sig_atr = engine.get_next_signal()
+                self.update_position()
             except Exception as e:
-                color_line(f"One-shot engine error: {e}", role="info")
-                time.sleep(10)
+                color_line(f"get_xrp_data error during TP/SL verification: {e}", role="info")
+                time.sleep(POLL_INTERVAL)
                 continue
 
-            if signal not in ("BUY", "SELL"):
-                color_line(f"Engine returned non-trade signal ({signal}). Restarting cycle.", role="info")
-                time.sleep(3)
-                continue
+            pos = self.position
+            tp_missing = abs(pos.take_profit) < 0.00001
+            sl_missing = abs(pos.stop_loss) < 0.00001
 
-            color_line(f"Received signal -> {signal} | Price: {sig_price} | ATR: {sig_atr}", role=signal.lower())
+            if not tp_missing and not sl_missing:
+                color_line(f"TP ({pos.take_profit}) and SL ({pos.stop_loss}) confirmed.", role="info")
+                return True
 
-            # 3) Place market order based on signal
-            placed = place_market_order_and_confirm(signal)
-            if not placed:
-                color_line("Market order placement/confirmation failed. Restarting loop.", role="info")
-                time.sleep(5)
-                continue
+            # Attempt to set missing ones
+            tp_to_send = tp_price if tp_missing else 0.0
+            sl_to_send = sl_price if sl_missing else 0.0
+            target = "BOTH" if tp_missing and sl_missing else ("TP" if tp_missing else "SL")
 
-            # 4) Compute TP & SL using ATR + fee_move
-            entry_price = CDX_pos_entry_price if CDX_pos_entry_price and CDX_pos_entry_price > 0 else float(sig_price)
-            atr_for_levels = sig_atr if sig_atr is not None else MIN_MAX_ATR_ENTRY
+            color_line(f"Missing -> TP:{tp_missing}, SL:{sl_missing}. Retrying set ({target})", role="info")
+            self.attempt_set_tpsl(tp_to_send, sl_to_send)
+            time.sleep(POLL_INTERVAL)
+
+        color_line("TP/SL verification timed out.", role="info")
+        return False
 
+    # -------------------------
+    # BLOCK 7: Position Monitoring
+    # -------------------------
+    def wait_for_position_close(self) -> bool:
+        """
+        Wait until exchange reports no active position and confirm it REQUIRED_CLOSED_CHECKS times.
+        """
+        color_line("Waiting for position to close (5x confirmation)...", role="info")
+        consecutive = 0
+        while consecutive < REQUIRED_CLOSED_CHECKS:
             try:
-                tp_price, sl_price, details = compute_tpsl_from_atr_and_fee(entry_price, atr_for_levels, signal)
+                self.update_position()
             except Exception as e:
-                color_line(f"TP/SL computation error: {e} -> falling back to static offsets", role="info")
-                # fallback static offsets (previous behavior)
-                tp_price = round(entry_price + 0.02, 4) if signal == "BUY" else round(entry_price - 0.02, 4)
-                sl_price = round(entry_price - 0.0085, 4) if signal == "BUY" else round(entry_price + 0.0085, 4)
-                details = {"fallback": True}
+                color_line(f"get_xrp_data failed while waiting for close: {e}", role="info")
+                consecutive = 0
+                time.sleep(POLL_INTERVAL)
+                continue
 
-            color_line(f"TP: {tp_price} | SL: {sl_price} | details: {details}", role=signal.lower())
+            if not self.position.is_open:
+                consecutive += 1
+                color_line(f"Closure confirmation {consecutive}/{REQUIRED_CLOSED_CHECKS}", role="info")
+            else:
+                if consecutive > 0:
+                    color_line("Position re-detected active; resetting confirmation count", role="info")
+                consecutive = 0
+            time.sleep(POLL_INTERVAL)
+        color_line("Position confirmed closed.", role="info")
+        return True
 
-            # 5) Place TP & SL
-            attempt_set_tpsl(tp_price, sl_price)
+    # -------------------------
+    # BLOCK 8: Main Execution Flow
+    # -------------------------
+    def run(self):
+        color_line(f"--- BOT STARTUP ({self.name}) ---", role="info")
+        botstate.register(self.state)
 
-            # 6) Verify & retry missing TP/SL
-            verify_and_retry_tpsl(signal, tp_price, sl_price)
+        if self.dynamic_quantity:
+            try:
+                self.build_risk_table()
+            except Exception as e:
+                color_line(f"Risk table build failed, sizing each signal directly: {e}", role="info")
 
-            # 7) Monitor position until closed
-            color_line("Monitoring active position until closed...", role="info")
-            wait_for_position_close()
+        try:
+            self.journal = TradeJournal(symbol=self.symbol)
+            totals = self.journal.running_pnl()
+            self.state.update(cumulative_pnl_est=round(totals["pnl_est"], 2),
+                              cycle_step=int(totals["trades"]) + 1)
+            color_line(f"Trade journal: {self.journal.path} | Trades: {totals['trades']} | "
+                       f"Est. PnL: {totals['pnl_est']:.2f}", role="info")
+        except Exception as e:
+            self.journal = None
+            color_line(f"Trade journal disabled: {e}", role="info")
 
-            # 8) Repeat cycle
-            color_line("Trade cycle complete. Preparing next cycle.", role="info")
-            time.sleep(3)
+        try:
+            while True:
+                try:
+                    self.run_cycle()
+                except Exception as e:
+                    color_line(f"UNHANDLED ERROR in main loop: {e}", role="info")
+                    traceback.print_exc()
+                    self.state.transition(botstate.IDLE, last_error=str(e))
+                    color_line("Sleeping 60s before retrying...", role="info")
+                    time.sleep(60)
+        finally:
+            botstate.unregister(self.name)
+            if self.journal is not None:
+                self.journal.close()
+
+    def abort_cycle(self, reason: str, delay: float) -> None:
+        """Log, drop back to idle and wait before the next cycle."""
+        color_line(reason, role="info")
+        self.state.transition(botstate.IDLE, last_error=reason)
+        time.sleep(delay)
+
+    def run_cycle(self) -> None:
+        """One full trade cycle: signal -> entry -> TP/SL -> close."""
+        state = self.state
+
+        # 1) Check current position
+        try:
+            self.update_position(is_initial_check=True)
+        except Exception as e:
+            self.abort_cycle(f"Initial get_xrp_data failed: {e}", 10)
+            return
+
+        # If non-zero, wait until closed (skip engine); set TP/SL first if missing
+        pos = self.position
+        if pos.is_open and (abs(pos.take_profit) < 0.00001 or abs(pos.stop_loss) < 0.00001):
+            side = "BUY" if pos.active_pos > 0 else "SELL"
+            entry_price = pos.entry_price if pos.entry_price > 0 else pos.price
+            color_line(f"Unprotected {side} position detected (TP: {pos.take_profit}, SL: {pos.stop_loss}). Setting protection.", role="info")
+            self.journal_event("fill", side=side, price=entry_price, quantity=abs(pos.active_pos),
+                               leverage=self.leverage, adopted=True)
+            self.protect_and_monitor(side, entry_price, abs(pos.active_pos), self.current_atr(), adopted=True)
+            return
+
+        if pos.is_open:
+            color_line("Active position detected on startup. Monitoring until closed.", role="info")
+            state.transition(botstate.IN_POSITION)
+            self.wait_for_position_close()
+            state.transition(botstate.CLOSED)
+            state.transition(botstate.IDLE)
+            return
+
+        # 2) Position zero -> start one-shot engine
+        color_line("Position zero confirmed. Starting one-shot live engine for next valid signal...", role="info")
+        engine = DataEngine()
+        try:
+            engine.load_historical(limit=500)
+        except Exception as e:
+            self.abort_cycle(f"Failed to load historical candles: {e}", 10)
+            return
 
+        try:
+            signal, sig_price, sig_atr = engine.get_next_signal()
         except Exception as e:
-            color_line(f"UNHANDLED ERROR in main loop: {e}", role="info")
-            traceback.print_exc()
-            color_line("Sleeping 60s before retrying...", role="info")
-            time.sleep(60)
-            continue
+            self.abort_cycle(f"One-shot engine error: {e}", 10)
+            return
+
+        if signal not in ("BUY", "SELL"):
+            self.abort_cycle(f"Engine returned non-trade signal ({signal}). Restarting cycle.", 3)
+            return
+
+        color_line(f"Received signal -> {signal} | Price: {sig_price} | ATR: {sig_atr}", role=signal.lower())
+        state.transition(botstate.SIGNAL, signal=signal, signal_price=sig_price, signal_atr=sig_atr)
+        self.journal_event("signal", side=signal, price=sig_price, atr=sig_atr)
+
+        # 3) Size & place market order based on signal
+        atr_for_levels = sig_atr if sig_atr is not None else MIN_MAX_ATR_ENTRY
+        quantity = self.size_position(float(sig_price), atr_for_levels)
+        if quantity <= 0:
+            self.abort_cycle(f"No quantity fits risk budget (price {sig_price}, ATR {atr_for_levels}). Skipping signal.", 3)
+            return
+
+        state.transition(botstate.ENTERING, quantity=quantity)
+        placed = self.place_market_order_and_confirm(signal, quantity)
+        if not placed:
+            self.abort_cycle("Market order placement/confirmation failed. Restarting loop.", 5)
+            return
+
+        entry = self.position.entry_price
+        entry_price = entry if entry and entry > 0 else float(sig_price)
+        self.journal_event("fill", side=signal, price=entry_price, quantity=quantity, leverage=self.leverage)
+        self.protect_and_monitor(signal, entry_price, quantity, atr_for_levels)
+
+    def current_atr(self) -> float:
+        """Latest MAX_ATR from recent candles (MIN_MAX_ATR_ENTRY if unavailable)."""
+        try:
+            engine = DataEngine()
+            engine.load_historical(limit=500)
+            atr = float(engine.df["MAX_ATR"].iloc[-1])
+            if not math.isnan(atr):
+                return atr
+        except Exception as e:
+            color_line(f"ATR fetch failed: {e}", role="info")
+        return MIN_MAX_ATR_ENTRY
+
+    def protect_and_monitor(self, signal: str, entry_price: float, quantity: float,
+                            atr_for_levels: float, adopted: bool = False) -> None:
+        """
+        Set & verify TP/SL for an open position, wait for it to close and
+        journal the exit. `adopted`: position found open at cycle start;
+        any TP/SL already on the exchange is kept.
+        """
+        state = self.state
+
+        # 4) Compute TP & SL using ATR + fee_move
+        try:
+            tp_price, sl_price, details = compute_tpsl_from_atr_and_fee(entry_price, atr_for_levels, signal,
+                                                                        quantity, self.leverage)
+        except Exception as e:
+            color_line(f"TP/SL computation error: {e} -> falling back to static offsets", role="info")
+            # fallback static offsets (previous behavior)
+            tp_price = round(entry_price + 0.02, 4) if signal == "BUY" else round(entry_price - 0.02, 4)
+            sl_price = round(entry_price - 0.0085, 4) if signal == "BUY" else round(entry_price + 0.0085, 4)
+            details = {"fallback": True}
+
+        if adopted:
+            pos = self.position
+            tp_price = pos.take_profit if abs(pos.take_profit) > 0.00001 else tp_price
+            sl_price = pos.stop_loss if abs(pos.stop_loss) > 0.00001 else sl_price
+
+        color_line(f"TP: {tp_price} | SL: {sl_price} | details: {details}", role=signal.lower())
+        state.transition(botstate.PROTECTING, signal=signal, quantity=quantity,
+                         tp_price=tp_price, sl_price=sl_price)
+
+        # 5) Place TP & SL (adopted: verify below sets only the missing ones)
+        if not adopted:
+            self.attempt_set_tpsl(tp_price, sl_price)
+
+        # 6) Verify & retry missing TP/SL
+        verified = self.verify_and_retry_tpsl(signal, tp_price, sl_price)
+        self.journal_event("tpsl", side=signal, price=entry_price, atr=atr_for_levels,
+                           tp_price=tp_price, sl_price=sl_price, verified=verified, levels=details)
+
+        # 7) Monitor position until closed
+        state.transition(botstate.IN_POSITION)
+        color_line("Monitoring active position until closed...", role="info")
+        self.wait_for_position_close()
+
+        # 8) Record exit & update running PnL (estimated: actual fill not fetched)
+        snap = state.snapshot()
+        exit_price, exit_reason = estimate_exit_price(signal, tp_price, sl_price, snap.position.last_active_price)
+        pnl_est = compute_trade_pnl(signal, entry_price, exit_price, quantity, FX)
+        cumulative_pnl_est = round(snap.cumulative_pnl_est + pnl_est, 2)
+        self.journal_event("exit", side=signal, price=exit_price, quantity=quantity,
+                           tp_price=tp_price, sl_price=sl_price, pnl_est=pnl_est,
+                           exit_reason=exit_reason, entry_price=entry_price)
+        color_line(f"Trade #{snap.cycle_step} closed ~{exit_price} ({exit_reason}) | Est. PnL: {pnl_est} | "
+                   f"Est. cumulative: {cumulative_pnl_est}", role="info")
+        if cumulative_pnl_est >= PROFIT_TARGET:
+            color_line(f"Profit target {PROFIT_TARGET} reached (estimated: {cumulative_pnl_est:.2f}).", role="buy")
+        state.transition(botstate.CLOSED, cumulative_pnl_est=cumulative_pnl_est, cycle_step=snap.cycle_step + 1)
+
+        # 9) Repeat cycle
+        color_line("Trade cycle complete. Preparing next cycle.", role="info")
+        state.transition(botstate.IDLE, last_error=None)
+        time.sleep(3)
+
+def main():
+    CDXBot().run()
 
 # -------------------------
 # BLOCK 9: Script Entry
 # -------------------------
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
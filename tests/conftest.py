@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Support modules are imported by bare name (as the bots do via sys.path)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUPPORT_DIR = os.path.join(ROOT, "CDX_Support_File")
+if SUPPORT_DIR not in sys.path:
+    sys.path.insert(0, SUPPORT_DIR)
@@ -0,0 +1,216 @@
+import threading
+import time
+
+import pytest
+
+import CDXresilience as resilience
+from CDXresilience import BudgetExceeded, CircuitBreaker, CircuitOpenError, Endpoint
+
+# Short budget: hedge_delay() is budget / 2 until latency samples exist
+BUDGET = 0.4
+
+
+class Response:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+
+class Attempts:
+    """
+    Fake fn(timeout): each call takes the next behaviour from a script.
+      ("ok", value)   return value immediately
+      ("fail", exc)   raise exc immediately
+      ("hang", None)  block until release(), ignoring timeout (a stuck request)
+    """
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.timeouts = []
+        self._release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, timeout):
+        with self._lock:
+            self.timeouts.append(timeout)
+            kind, value = self.script.pop(0)
+        if kind == "ok":
+            return value
+        if kind == "fail":
+            raise value
+        self._release.wait()
+        raise TimeoutError("attempt released")
+
+    def release(self):
+        self._release.set()
+
+
+@pytest.fixture
+def attempts():
+    created = []
+
+    def make(*script):
+        fn = Attempts(*script)
+        created.append(fn)
+        return fn
+
+    yield make
+    for fn in created:
+        fn.release()
+
+
+# -------------------------
+# Endpoint.call
+# -------------------------
+def test_plain_call_passes_budget_and_records_latency():
+    ep = Endpoint("plain", budget=BUDGET)
+    fn = Attempts(("ok", "value"))
+    assert ep.call(fn) == "value"
+    assert fn.timeouts == [BUDGET]
+    assert ep.breaker.failures == 0
+    assert len(ep.latency._samples) == 1
+
+
+def test_call_budget_only_lowers_endpoint_budget():
+    ep = Endpoint("capped", budget=BUDGET)
+    fn = Attempts(("ok", 1), ("ok", 2))
+    ep.call(fn, budget=0.1)
+    ep.call(fn, budget=10)
+    assert fn.timeouts == [0.1, BUDGET]
+
+
+def test_no_budget_left_raises_without_touching_breaker():
+    ep = Endpoint("spent", budget=BUDGET)
+    fn = Attempts()
+    with pytest.raises(BudgetExceeded):
+        ep.call(fn, budget=0)
+    assert fn.timeouts == []
+    assert ep.breaker.failures == 0
+
+
+def test_5xx_is_returned_but_counts_as_failure():
+    ep = Endpoint("server-error", budget=BUDGET)
+    response = Response(503)
+    assert ep.call(Attempts(("ok", response))) is response
+    assert ep.breaker.failures == 1
+    assert len(ep.latency._samples) == 0
+
+
+def test_hedged_fast_failure_raises_without_hedging(attempts):
+    ep = Endpoint("fast-fail", budget=BUDGET, hedge=True)
+    fn = attempts(("fail", ValueError("bad request")), ("ok", "unused"))
+    with pytest.raises(ValueError):
+        ep.call(fn)
+    assert ep.hedges_fired == 0
+    assert len(fn.timeouts) == 1
+    assert ep.breaker.failures == 1
+
+
+def test_hedge_wins_when_first_attempt_is_slow(attempts):
+    ep = Endpoint("slow-first", budget=BUDGET, hedge=True)
+    fn = attempts(("hang", None), ("ok", "hedged"))
+    assert ep.call(fn) == "hedged"
+    assert ep.hedges_fired == 1
+    # The hedge only gets what is left of the budget
+    assert fn.timeouts[0] == BUDGET
+    assert 0 < fn.timeouts[1] <= BUDGET - ep.hedge_delay(BUDGET) + 0.01
+    assert ep.breaker.failures == 0
+
+
+def test_hedge_failure_still_waits_for_first_attempt():
+    ep = Endpoint("hedge-fails", budget=BUDGET, hedge=True)
+    first = threading.Event()
+    results = iter([first, None])
+
+    def fn(timeout):
+        gate = next(results)
+        if gate is None:
+            raise ConnectionError("hedge failed")
+        gate.wait(timeout)
+        return "first"
+
+    threading.Timer(BUDGET * 0.75, first.set).start()
+    assert ep.call(fn) == "first"
+    assert ep.hedges_fired == 1
+
+
+def test_all_attempts_past_budget_raise_budget_exceeded(attempts):
+    ep = Endpoint("all-slow", budget=BUDGET, hedge=True)
+    fn = attempts(("hang", None), ("hang", None))
+    start = time.monotonic()
+    with pytest.raises(BudgetExceeded):
+        ep.call(fn)
+    assert time.monotonic() - start < BUDGET + 0.2
+    assert ep.hedges_fired == 1
+    assert ep.breaker.failures == 1
+
+
+def test_open_breaker_rejects_calls_without_calling_fn():
+    ep = Endpoint("tripped", budget=BUDGET)
+    for _ in range(resilience.FAILURE_THRESHOLD):
+        with pytest.raises(ConnectionError):
+            ep.call(Attempts(("fail", ConnectionError("down"))))
+    fn = Attempts(("ok", "unused"))
+    with pytest.raises(CircuitOpenError):
+        ep.call(fn)
+    assert fn.timeouts == []
+
+
+# -------------------------
+# CircuitBreaker
+# -------------------------
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker("b", failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == resilience.CLOSED
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker("b", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == resilience.CLOSED
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker("b", failure_threshold=1, reset_timeout=0.05)
+    trip(breaker)
+    time.sleep(0.06)
+    breaker.before_call()                      # the probe
+    assert breaker.state == resilience.HALF_OPEN
+    with pytest.raises(CircuitOpenError):      # concurrent caller
+        breaker.before_call()
+
+
+def test_half_open_probe_success_closes():
+    breaker = CircuitBreaker("b", failure_threshold=1, reset_timeout=0.05)
+    trip(breaker)
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == resilience.CLOSED
+    breaker.before_call()
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker("b", failure_threshold=3, reset_timeout=0.05)
+    trip(breaker)
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
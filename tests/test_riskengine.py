@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+import CDXriskengine as riskengine
+
+QTY_CHOICES = tuple(q / 2 for q in range(2, 41))   # as in CDXMainbotxrp
+FX = 96
+LEVERAGE = 60
+RISK_BUDGET = 60.0
+MAX_MARGIN = 500.0
+
+
+def scalar_fee_move(price, qty, leverage, fx, roe):
+    """The original per-trade formula from CDXMainbotxrp, kept as the reference."""
+    fee_margin = (qty * price * fx) * 0.0005 * 1.18
+    bet_amount = ((qty * price * fx) / leverage) + fee_margin
+    if qty == 0 or fx == 0:
+        return 0.0001
+    return roe * bet_amount / qty / fx
+
+
+def make_table(atr_step):
+    return riskengine.RiskTable((0.1, 5.0, 0.005), (0.0, 0.2, atr_step), QTY_CHOICES, (LEVERAGE,),
+                                fx=FX, risk_budget=RISK_BUDGET, max_margin=MAX_MARGIN)
+
+
+@pytest.mark.parametrize("qty", [0, 1.0, 3.5, 20.0])
+def test_fee_move_matches_scalar_formula(qty):
+    prices = np.array([0.5, 2.5, 3.1])
+    expected = [scalar_fee_move(p, qty, LEVERAGE, FX, 0.07) for p in prices]
+    assert np.allclose(riskengine.fee_move(prices, qty, LEVERAGE, FX, 0.07), expected)
+
+
+def test_sl_multiplier_cutoff():
+    assert list(riskengine.sl_multiplier([0.05, 0.08, 0.0801])) == [1.5, 1.5, 1.0]
+
+
+def test_sl_move_ceiling_bounds_every_lower_atr():
+    atrs = np.linspace(0.0, 0.2, 4001)
+    actual = riskengine.sl_multiplier(atrs) * atrs
+    ceiling = riskengine.sl_move_ceiling(atrs)
+    assert np.all(ceiling >= np.maximum.accumulate(actual) - 1e-12)
+
+
+def test_max_quantity_is_largest_fitting_choice():
+    rng = np.random.default_rng(0)
+    prices = rng.uniform(0.1, 5.0, 500)
+    atrs = rng.uniform(0.0, 0.2, 500)
+    qty = riskengine.max_quantity(prices, atrs, LEVERAGE, QTY_CHOICES, FX, RISK_BUDGET, MAX_MARGIN)
+
+    sized = qty > 0
+    assert np.all(riskengine.loss_at_stop(prices[sized], atrs[sized], qty[sized], FX) <= RISK_BUDGET + 1e-9)
+    assert np.all(riskengine.bet_amount(prices[sized], qty[sized], LEVERAGE, FX) <= MAX_MARGIN + 1e-9)
+
+    # One step up the quantity grid must break a limit
+    choices = np.array(QTY_CHOICES)
+    for p, a, q in zip(prices, atrs, qty):
+        bigger = choices[choices > q]
+        if bigger.size:
+            nxt = bigger[0]
+            assert (riskengine.loss_at_stop(p, a, nxt, FX) > RISK_BUDGET
+                    or riskengine.bet_amount(p, nxt, LEVERAGE, FX) > MAX_MARGIN)
+
+
+def test_max_quantity_keeps_exact_grid_limit():
+    budget = float(riskengine.loss_at_stop(2.5, 0.01, 3.5, FX))
+    assert float(riskengine.max_quantity(2.5, 0.01, LEVERAGE, QTY_CHOICES, FX, budget, MAX_MARGIN)) == 3.5
+
+
+# 0.0005 lands exactly on the 0.08 sl_mult cutoff; 0.0007 straddles it
+# (0.0798 -> 0.0805), which used to table 1.0 × 0.0805 for ATR 0.08.
+@pytest.mark.parametrize("atr_step", [0.0005, 0.0007])
+def test_table_never_riskier_than_input(atr_step):
+    table = make_table(atr_step)
+    rng = np.random.default_rng(1)
+    prices = rng.uniform(0.1, 5.0, 2000)
+    atrs = np.concatenate([rng.uniform(0.0, 0.2, 1500), rng.uniform(0.078, 0.082, 500)])
+
+    for p, a in zip(prices, atrs):
+        qty = table.lookup(p, a, LEVERAGE)
+        assert qty is not None
+        assert qty <= float(riskengine.max_quantity(p, a, LEVERAGE, QTY_CHOICES, FX, RISK_BUDGET, MAX_MARGIN))
+        assert float(riskengine.loss_at_stop(p, a, qty, FX)) <= RISK_BUDGET + 1e-9
+
+
+def test_table_at_cutoff_with_straddling_grid():
+    table = make_table(0.0007)
+    qty = table.lookup(2.5, 0.08, LEVERAGE)
+    assert float(riskengine.loss_at_stop(2.5, 0.08, qty, FX)) <= RISK_BUDGET
+
+
+def test_lookup_outside_grid_or_leverage():
+    table = make_table(0.0005)
+    assert table.lookup(5.5, 0.01, LEVERAGE) is None
+    assert table.lookup(2.5, 0.25, LEVERAGE) is None
+    assert table.lookup(2.5, 0.01, 25) is None
+    # Below the grid rounds up to the first cell
+    assert table.lookup(0.05, 0.01, LEVERAGE) == table.lookup(0.1, 0.01, LEVERAGE)